@@ -0,0 +1,360 @@
+import asyncio
+
+import httpx
+
+from premiumize.exceptions import PremiumizeException
+from premiumize.premiumize import (_loads, _retry_delay, _move_params,
+                                   _browse_params, _folder_files,
+                                   _torrent_files, _ENDPOINTS, _MAX_WORKERS,
+                                   _READ_ENDPOINTS, _RETRIES,
+                                   _RETRY_STATUS_READ, _RETRY_STATUS_MODIFY,
+                                   _TIMEOUT)
+
+class AsyncPremiumize:
+    """
+    Asynchronous context for the library functions. Mirrors L{Premiumize},
+    but every API method is a coroutine. All requests are multiplexed over a
+    single HTTP/2 connection, so independent calls can be awaited together
+    with C{asyncio.gather}.
+
+    @group Folder Operations: *_folder
+    @group Item Operations: *_item, *_items
+    @group Torrent Operations: *_torrent, *_torrents
+    @group Transfer Operations: *_transfer
+    """
+
+    def __init__(self, user_id, user_pin,
+                 base_url="https://www.premiumize.me/api"):
+        """
+        Initialize the context. Customer ID and PIN can be copied from
+        U{https://www.premiumize.me/account}
+
+        @param user_id: Customer ID used to authenticate against the API
+        @type user_id: C{str}
+        @param user_pin: PIN used to authenticate against the API
+        @type user_pin: C{str}
+        """
+        self.user_id = user_id
+        self.user_pin = user_pin
+        self.base_url = base_url
+        self._auth = {
+            "customer_id": user_id,
+            "pin": user_pin
+        }
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            params=self._auth,
+            # httpx already advertises every encoding it can decode
+            headers={"Accept": "application/json"},
+            timeout=_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(http2=True, retries=_RETRIES)
+        )
+        # HTTP/2 streams share one connection, so the connection pool does
+        # not bound concurrency. Cap in-flight requests explicitly instead.
+        self._limit = asyncio.Semaphore(_MAX_WORKERS)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the underlying HTTP client and release its connections.
+        """
+        await self._client.aclose()
+
+    async def _request(self, endpoint, params=None):
+        """
+        Internal method, used for performing HTTP requests.
+
+        @param endpoint: Name of the endpoint, e.g. C{folder_list}
+        @type endpoint: C{str}
+        @param params: Additional GET parameters to be added to the request
+        @type params: C{dict}
+
+        @return: Data structure with result of the request
+        @rtype: C{dict}
+        @raise PremiumizeException: if the server answered with an HTTP error
+        """
+        path = _ENDPOINTS[endpoint]
+        if endpoint in _READ_ENDPOINTS:
+            retry_status = _RETRY_STATUS_READ
+        else:
+            retry_status = _RETRY_STATUS_MODIFY
+
+        for attempt in range(_RETRIES + 1):
+            async with self._limit:
+                resp = await self._client.get(path, params=params)
+            if resp.status_code not in retry_status or attempt == _RETRIES:
+                break
+            await asyncio.sleep(_retry_delay(resp, attempt))
+
+        if not resp.is_success:
+            raise PremiumizeException(
+                f"HTTP {resp.status_code}: {resp.reason_phrase}")
+
+        return _loads(resp.content)
+
+    async def _call(self, endpoint, params, error_prefix):
+        """
+        Internal method, performs a request that modifies the cloud storage
+        or the transfers and raises on an API error.
+
+        @param endpoint: Name of the endpoint, e.g. C{folder_create}
+        @type endpoint: C{str}
+        @param params: Additional GET parameters to be added to the request
+        @type params: C{dict}
+        @param error_prefix: Prefix for the message of the raised exception
+        @type error_prefix: C{str}
+
+        @return: Data structure with result of the request
+        @rtype: C{dict}
+        @raise PremiumizeException: if the API reported an error
+        """
+        req_res = await self._request(endpoint, params)
+
+        if req_res["status"] == "error":
+            raise PremiumizeException(f"{error_prefix}: {req_res['message']}")
+
+        return req_res
+
+    async def list_folder(self, id=None):
+        """
+        List the contents of a folder
+
+        @param id: ID of the folder that should be listed. If C{id} is not
+            given, the contents of the root folder will be listed.
+        @type id: C{int}
+
+        @return: Content of the folder
+        @rtype: C{list} of L{PremiumizeFile}
+        @raise PremiumizeException: if the contents of the folder could not be listed.
+        """
+        if id is None:
+            params = {}
+        else:
+            params = { "id": id }
+
+        req_res = await self._request("folder_list", params)
+
+        if req_res["status"] != "success":
+            raise PremiumizeException(req_res["message"])
+
+        return list(_folder_files(req_res['content']))
+
+    async def create_folder(self, name, parent_id=None):
+        """
+        Create a folder called C{name} in the folder with the ID C{parent_id}.
+        If C{parent_id} is not given, the folder will be created in the root
+        folder.
+
+        @param name: Name of the folder
+        @type name: C{str}
+        @param parent_id: ID of the parent folder
+        @type parent_id: C{int}
+
+        @raise PremiumizeException: if there was an error while creating the
+            folder.
+        """
+        params = {
+            "name": name,
+        }
+
+        if parent_id is not None:
+            params["parent_id"] = parent_id
+
+        await self._call("folder_create", params, "Error creating folder")
+
+    async def delete_folder(self, id):
+        """
+        Delete the folder with the ID C{id}.
+
+        @param id: ID of the folder which should be deleted
+        @type id: C{int}
+
+        @raise PremiumizeException: if there was an error deleting the folder
+        """
+        params = {
+            "id": id
+        }
+
+        await self._call("folder_delete", params, "Error deleting folder")
+
+    async def rename_folder(self, id, new_name):
+        """
+        Renames the folder with the ID C{id} to C{newname}
+
+        @param id: ID of the folder that should be renamed
+        @type id: C{id}
+        @param new_name: New name of the folder
+        @type new_name: C{str}
+
+        @raise PremiumizeException: if there was an error renaming the folder
+        """
+        params = {
+            "id": id,
+            "name": new_name
+        }
+
+        await self._call("folder_rename", params, "Error renaming folder")
+
+    async def move_item(self, item, folder_id=None):
+        """
+        Moves C{item} to the folder with the id C{folder_id}. If C{folder_id}
+        is not given, C{item} will be moved into the root folder. Items that
+        already are the target folder are skipped; if nothing is left to
+        move, no request is sent.
+
+        @param item: Item that should be moved
+        @type item: L{PremiumizeFile} or iterable of L{PremiumizeFile}
+        @param folder_id: ID of the folder that C{item} should be moved to
+        @type folder_id: C{str}
+
+        @raise PremiumizeException: if there was an error moving the item(s)
+        """
+        params = _move_params(item, folder_id)
+
+        if params is None:
+            return
+
+        await self._call("folder_paste", params, "Error moving item")
+
+    async def delete_item(self, item):
+        """
+        Delete C{item} from the cloud storage
+
+        @param item: item to delete
+        @type item: L{PremiumizeFile}
+
+        @raise PremiumizeException: if there was an error deleting the item.
+        """
+        params = {
+            "type": item.type,
+            "id": item.id
+        }
+
+        await self._call("item_delete", params, "Error deleting item")
+
+    async def delete_items(self, items):
+        """
+        Delete all of C{items} from the cloud storage. The requests are issued
+        concurrently, so this operation is B{not} atomic: if one deletion
+        fails, others may already have succeeded.
+
+        @param items: items to delete
+        @type items: iterable of L{PremiumizeFile}
+
+        @raise PremiumizeException: if there was an error deleting an item.
+        """
+        await asyncio.gather(*(self.delete_item(item) for item in items))
+
+    async def browse_torrent(self, item):
+        """
+        View the contents of a torrent in cloud storage
+
+        @param item: Torrent to view
+        @type item: L{PremiumizeFile}
+
+        @return: Contents of the Torrent
+        @rtype: C{list} of L{PremiumizeFile}
+
+        @raise PremiumizeException: If there was an error browsing the torrent
+
+        """
+        params = _browse_params(item)
+
+        req_res = await self._request("torrent_browse", params=params)
+
+        if req_res["status"] == "error":
+            raise PremiumizeException("Error browsing torrent: " +
+                                      req_res["message"])
+
+        return list(_torrent_files(req_res['content']))
+
+    async def browse_torrents(self, items):
+        """
+        View the contents of several torrents in cloud storage. The torrents
+        are browsed concurrently.
+
+        @param items: Torrents to view
+        @type items: iterable of L{PremiumizeFile}
+
+        @return: Contents of each torrent, in the order of C{items}
+        @rtype: C{list} of C{list} of L{PremiumizeFile}
+
+        @raise PremiumizeException: If there was an error browsing a torrent
+        """
+        return list(await asyncio.gather(
+            *(self.browse_torrent(item) for item in items)
+        ))
+
+    async def start_transfer(self, source, folder_id=None):
+        """
+        Start a torrent transfer. The files from the torrent will be written to
+        C{folder_id}. If C{folder_id} is not given (or C{None}), the files will
+        be written to the root folder.
+
+        @param source: Magnet Link or URL of C{.torrent} file
+        @type source: C{str}
+
+        @param folder_id: ID of the folder that the torrent's files should be
+            written to.
+        @type folder_id: C{int}
+
+        @raise PremiumizeException: If there was an error starting the transfer
+
+        """
+        params = {
+            "src": source,
+            "type": "torrent"
+        }
+
+        if folder_id is not None:
+            params['folder_id'] = folder_id
+
+        await self._call("transfer_create", params, "Error starting transfer")
+
+    async def list_transfer(self):
+        """
+        List all transfers.
+
+
+        @return: list of structures with transfer information
+        @rtype: C{list} of C{dict}
+        """
+        req_res = await self._request("transfer_list")
+
+        return req_res['transfers']
+
+    async def clear_finished_transfer(self):
+        """
+        Clears finished transfers
+
+        @raise PremiumizeException: If there was an error clearing the finished
+            transfers.
+        """
+        await self._call("transfer_clearfinished", None,
+                         "Error clearing finished transfers")
+
+    async def abort_transfer(self, type, id):
+        """
+        Clears or aborts a transfer
+
+        @param type: Type of the transfer that should be deleted. At the moment
+            only C{torrent} is supported
+        @type type: C{str}
+
+        @param id: ID of the transfer that should be deleted.
+        @type id: C{int}
+
+        @raise PremiumizeException: If there was an error aborting the transfer
+        """
+        params = {
+            "type": type,
+            "id": id
+        }
+
+        await self._call("transfer_delete", params, "Error deleting transfer")
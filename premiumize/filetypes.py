@@ -1,17 +1,67 @@
+from dataclasses import dataclass, field, fields
+from typing import Optional
+
+
+@dataclass(slots=True, eq=False)
 class PremiumizeFile:
     """
     Files stored in the Premiumize Cloud
+
+    Fields documented by the API are stored in slots. Anything else the API
+    returns ends up in C{extra} and is still reachable as an attribute.
+    Objects compare and hash by identity. Use L{from_api} to create one from
+    an API dataset.
     """
 
-    def __init__(self, data):
+    id: Optional[str] = None
+    name: Optional[str] = None
+    type: Optional[str] = None
+    size: Optional[int] = None
+    hash: Optional[str] = None
+    created_at: Optional[int] = None
+    mime_type: Optional[str] = None
+    transcode_status: Optional[str] = None
+    link: Optional[str] = None
+    stream_link: Optional[str] = None
+    extra: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if isinstance(self.id, dict):
+            raise TypeError("PremiumizeFile() takes fields as arguments, "
+                            "use PremiumizeFile.from_api() for API data")
+        # The API is not consistent about ID types; keep them as str so they
+        # can be compared directly.
+        if self.id is not None and not isinstance(self.id, str):
+            self.id = str(self.id)
+
+    @classmethod
+    def from_api(cls, data):
         """
-        Create an object from a dataset received from the API
+        Create an object from a dataset received from the API. C{data} is
+        not modified.
 
         @param data: Dataset from the API
         @type data: C{dict}
+
+        @rtype: L{PremiumizeFile}
         """
-        for key in data:
-            self.__dict__[key] = data[key]
+        known = {key: data[key] for key in _FIELDS if key in data}
+        extra = {key: value for key, value in data.items()
+                 if key not in _FIELD_SET}
+        return cls(**known, extra=extra)
+
+    def __getattr__(self, name):
+        # Only called when regular lookup fails, i.e. for keys that were
+        # stored in extra.
+        try:
+            return object.__getattribute__(self, "extra")[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name) from None
 
     def __str__(self):
         return "PremiumizeFile \"%s\"" % self.name
+
+
+# Fields documented by the API, i.e. everything except the extra dict
+_FIELDS = tuple(f.name for f in fields(PremiumizeFile) if f.name != "extra")
+_FIELD_SET = frozenset(_FIELDS)
@@ -1,9 +1,156 @@
-import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from urllib.parse import urlencode
+
+import httpx
+
+# Pick the fastest available JSON parser once, at import time. All of them
+# accept the raw response bytes.
+try:
+    from orjson import loads as _loads
+except ImportError:
+    try:
+        from ujson import loads as _loads
+    except ImportError:
+        from json import loads as _loads
 
 from premiumize.filetypes import PremiumizeFile
 from premiumize.exceptions import PremiumizeException
 
+# Upper bound for concurrent requests issued by the *_items helpers, kept
+# low to stay clear of the API's rate limits.
+_MAX_WORKERS = 8
+
+# Timeouts in seconds for every API request
+_TIMEOUT = httpx.Timeout(30, connect=3.05)
+
+# Transient failures are retried with exponential backoff. Failed connects
+# are retried by the transport; the status codes below by _request. Once
+# retries are exhausted the last response is reported as usual.
+_RETRIES = 5
+# Reads can be repeated safely on any transient error. Other endpoints may
+# have done their work before a 5xx came back, so retrying them could e.g.
+# create a folder twice; they are only retried when rate limited.
+_READ_ENDPOINTS = frozenset(("folder_list", "transfer_list", "torrent_browse"))
+_RETRY_STATUS_READ = frozenset((429, 500, 502, 503, 504))
+_RETRY_STATUS_MODIFY = frozenset((429,))
+_BACKOFF = 0.3
+_BACKOFF_MAX = 120
+
+def _retry_delay(resp, attempt):
+    """
+    Seconds to wait before retrying C{resp}. Honors a numeric C{Retry-After}
+    header and falls back to exponential backoff otherwise.
+
+    @param resp: Response that should be retried
+    @type resp: C{httpx.Response}
+    @param attempt: Number of retries performed so far
+    @type attempt: C{int}
+
+    @rtype: C{float}
+    """
+    try:
+        delay = float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        delay = _BACKOFF * 2 ** attempt
+    return min(max(delay, 0), _BACKOFF_MAX)
+
+def _move_params(item, folder_id):
+    """
+    Build the C{/folder/paste} parameters for moving C{item} to C{folder_id}.
+    Items that already are the target folder are skipped.
+
+    @param item: Item that should be moved
+    @type item: L{PremiumizeFile} or iterable of L{PremiumizeFile}
+    @param folder_id: ID of the target folder, C{None} for the root folder
+    @type folder_id: C{str}
+
+    @return: Request parameters, or C{None} if there is nothing to move
+    @rtype: C{dict}
+    """
+    if isinstance(item, PremiumizeFile):
+        item = (item,)
+
+    # PremiumizeFile IDs are always str, so only folder_id needs
+    # normalizing, once.
+    target = None if folder_id is None else str(folder_id)
+    moves = {
+        f"items[{index}][{key}]": getattr(i_item, key)
+        for index, i_item in enumerate(item)
+        if i_item.id != target
+        for key in ("id", "type")
+    }
+
+    if not moves:
+        # Operation is trivial, no need to contact the API
+        return None
+
+    params = {}
+
+    if folder_id is not None:
+        params['id'] = folder_id
+
+    params.update(moves)
+    return params
+
+def _browse_params(item):
+    """
+    Build the C{/torrent/browse} parameters for C{item}.
+
+    @param item: Torrent to view
+    @type item: L{PremiumizeFile}
+
+    @rtype: C{dict}
+    @raise PremiumizeException: If C{item} is not a torrent
+    """
+    if item.type != "torrent":
+        raise PremiumizeException("item is not a torrent")
+
+    return {
+        "hash": item.hash
+    }
+
+def _folder_files(content):
+    """
+    Convert the content of a C{/folder/list} response.
+
+    @param content: C{content} of the response
+    @type content: C{list} of C{dict}
+
+    @rtype: generator of L{PremiumizeFile}
+    """
+    for file_dict in content:
+        yield PremiumizeFile.from_api(file_dict)
+
+def _torrent_files(content):
+    """
+    Convert the content of a C{/torrent/browse} response.
+
+    @param content: C{content} of the response
+    @type content: C{dict}
+
+    @rtype: generator of L{PremiumizeFile}
+    """
+    for node in content.values():
+        for child in node['children'].values():
+            yield PremiumizeFile.from_api(child)
+
+# API endpoints by name, relative to the base URL
+_ENDPOINTS = {
+    "folder_list": "/folder/list",
+    "folder_create": "/folder/create",
+    "folder_delete": "/folder/delete",
+    "folder_rename": "/folder/rename",
+    "folder_paste": "/folder/paste",
+    "item_delete": "/item/delete",
+    "torrent_browse": "/torrent/browse",
+    "transfer_create": "/transfer/create",
+    "transfer_list": "/transfer/list",
+    "transfer_clearfinished": "/transfer/clearfinished",
+    "transfer_delete": "/transfer/delete",
+}
+
 class Premiumize:
     """
     Context for the library functions
@@ -15,7 +162,7 @@ class Premiumize:
     """
 
     def __init__(self, user_id, user_pin,
-                 base_url="https://www.premiumize.me/api"):
+                 base_url="https://www.premiumize.me/api", cache_ttl=0):
         """
         Initialize the context. Customer ID and PIN can be copied from
         U{https://www.premiumize.me/account}
@@ -24,45 +171,185 @@ class Premiumize:
         @type user_id: C{str}
         @param user_pin: PIN used to authenticate against the API
         @type user_pin: C{str}
+        @param cache_ttl: Seconds for which folder and transfer listings are
+            served from a local cache. Any modifying call made through this
+            context clears the cache, but changes made elsewhere (web
+            interface, other clients, progressing transfers) are not seen
+            until entries expire. Defaults to C{0}, which disables caching.
+            Caching requires the C{cache} extra (C{cachetools}).
+        @type cache_ttl: C{int}
         """
         self.user_id = user_id
         self.user_pin = user_pin
         self.base_url = base_url
+        self._url = {name: base_url + path
+                     for name, path in _ENDPOINTS.items()}
+        self._auth = {
+            "customer_id": user_id,
+            "pin": user_pin
+        }
+        # Complete URLs for calls without extra parameters (listings, polling
+        # of transfers), so those skip query string encoding entirely.
+        auth_query = urlencode(self._auth)
+        self._bare_url = {name: f"{url}?{auth_query}"
+                          for name, url in self._url.items()}
+
+        # httpx already advertises every encoding it can decode
+        self._client = httpx.Client(
+            headers={"Accept": "application/json"},
+            timeout=_TIMEOUT,
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=_RETRIES,
+                limits=httpx.Limits(max_keepalive_connections=16)
+            )
+        )
+
+        if cache_ttl:
+            # Optional dependency, only needed when caching is enabled
+            from cachetools import TTLCache
+            self._read_cache = TTLCache(maxsize=128, ttl=cache_ttl)
+        else:
+            self._read_cache = None
+        self._read_cache_lock = threading.Lock()
+        # Bumped on every invalidation, so responses to reads that were in
+        # flight meanwhile are not stored
+        self._read_cache_generation = 0
 
-    def _request(self, endpoint, params={}):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the underlying HTTP client and release pooled connections.
+        """
+        self._client.close()
+
+    def _request(self, endpoint, params=None):
         """
         Internal method, used for performing HTTP requests.
 
-        @param endpoint: Endpoint portion of the URL, e.g. /folder/list
+        @param endpoint: Name of the endpoint, e.g. C{folder_list}
         @type endpoint: C{str}
         @param params: Additional GET parameters to be added to the request
         @type params: C{dict}
 
         @return: Data structure with result of the request
         @rtype: C{dict}
+        @raise PremiumizeException: if the server answered with an HTTP error
         """
-        request_params = {
-            "customer_id": self.user_id,
-            "pin": self.user_pin
-        }
+        if params:
+            url = self._url[endpoint]
+            params = {**self._auth, **params}
+        else:
+            # None rather than {}: httpx re-encodes the query for any params
+            url, params = self._bare_url[endpoint], None
 
-        for key in params:
-            request_params[key] = params[key]
+        if endpoint in _READ_ENDPOINTS:
+            retry_status = _RETRY_STATUS_READ
+        else:
+            retry_status = _RETRY_STATUS_MODIFY
 
-        req = requests.get(self.base_url + endpoint, params=request_params)
+        for attempt in range(_RETRIES + 1):
+            resp = self._client.get(url, params=params)
+            if resp.status_code not in retry_status or attempt == _RETRIES:
+                break
+            time.sleep(_retry_delay(resp, attempt))
 
-        return json.loads(req.text)
+        if not resp.is_success:
+            raise PremiumizeException(
+                f"HTTP {resp.status_code}: {resp.reason_phrase}")
 
-    def list_folder(self, id=None):
+        return _loads(resp.content)
+
+    def _cached_request(self, endpoint, params=None):
         """
-        List the contents of a folder
+        Internal method, like L{_request} but successful responses are served
+        from the read cache while they are fresh. Only use this for endpoints
+        that do not modify anything.
+
+        @param endpoint: Name of the endpoint, e.g. C{folder_list}
+        @type endpoint: C{str}
+        @param params: Additional GET parameters to be added to the request
+        @type params: C{dict}
+
+        @return: Data structure with result of the request
+        @rtype: C{dict}
+        """
+        if self._read_cache is None:
+            return self._request(endpoint, params)
+
+        key = (endpoint, frozenset(params.items()) if params else None)
+
+        with self._read_cache_lock:
+            hit = self._read_cache.get(key)
+            generation = self._read_cache_generation
+        if hit is not None:
+            return hit
+
+        req_res = self._request(endpoint, params)
+
+        if req_res.get("status") == "success":
+            with self._read_cache_lock:
+                if generation == self._read_cache_generation:
+                    self._read_cache[key] = req_res
+
+        return req_res
+
+    def _invalidate_cache(self):
+        """
+        Internal method, drops all cached listings. Called after every request
+        that may have modified the cloud storage or the transfers.
+        """
+        if self._read_cache is not None:
+            with self._read_cache_lock:
+                self._read_cache.clear()
+                self._read_cache_generation += 1
+
+    def _call(self, endpoint, params, error_prefix):
+        """
+        Internal method, performs a request that modifies the cloud storage
+        or the transfers and raises on an API error. Cached listings are
+        dropped, whatever the outcome.
+
+        @param endpoint: Name of the endpoint, e.g. C{folder_create}
+        @type endpoint: C{str}
+        @param params: Additional GET parameters to be added to the request
+        @type params: C{dict}
+        @param error_prefix: Prefix for the message of the raised exception
+        @type error_prefix: C{str}
+
+        @return: Data structure with result of the request
+        @rtype: C{dict}
+        @raise PremiumizeException: if the API reported an error
+        """
+        try:
+            req_res = self._request(endpoint, params)
+        finally:
+            # The server may have applied the change even if the request
+            # failed on our side
+            self._invalidate_cache()
+
+        if req_res["status"] == "error":
+            raise PremiumizeException(f"{error_prefix}: {req_res['message']}")
+
+        return req_res
+
+    def iter_folder(self, id=None):
+        """
+        Iterate over the contents of a folder. The request is sent when
+        iteration starts; files are created one at a time, and the generator
+        drops its reference to the raw response once it is exhausted.
 
         @param id: ID of the folder that should be listed. If C{id} is not
             given, the contents of the root folder will be listed.
         @type id: C{int}
 
         @return: Content of the folder
-        @rtype: C{list} of L{PremiumizeFile}
+        @rtype: generator of L{PremiumizeFile}
         @raise PremiumizeException: if the contents of the folder could not be listed.
         """
         if id is None:
@@ -70,17 +357,29 @@ class Premiumize:
         else:
             params = { "id": id }
 
-        req_res = self._request("/folder/list", params)
-
-        res = []
+        req_res = self._cached_request("folder_list", params)
 
         if req_res["status"] != "success":
             raise PremiumizeException(req_res["message"])
 
-        for file_dict in req_res['content']:
-            res.append(PremiumizeFile(file_dict))
+        content = req_res['content']
+        del req_res
+
+        yield from _folder_files(content)
+
+    def list_folder(self, id=None):
+        """
+        List the contents of a folder
+
+        @param id: ID of the folder that should be listed. If C{id} is not
+            given, the contents of the root folder will be listed.
+        @type id: C{int}
 
-        return res
+        @return: Content of the folder
+        @rtype: C{list} of L{PremiumizeFile}
+        @raise PremiumizeException: if the contents of the folder could not be listed.
+        """
+        return list(self.iter_folder(id))
 
     def create_folder(self, name, parent_id=None):
         """
@@ -103,11 +402,7 @@ class Premiumize:
         if parent_id is not None:
             params["parent_id"] = parent_id
 
-        req_res = self._request("/folder/create", params=params)
-
-        if not req_res["status"] == "success":
-            raise PremiumizeException("Error creating folder: " +
-                                      req_res["message"])
+        self._call("folder_create", params, "Error creating folder")
 
     def delete_folder(self, id):
         """
@@ -122,11 +417,7 @@ class Premiumize:
             "id": id
         }
 
-        req_res = self._request("/folder/delete", params=params)
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error deleting folder: " +
-                                      req_res["message"])
+        self._call("folder_delete", params, "Error deleting folder")
 
     def rename_folder(self, id, new_name):
         """
@@ -144,49 +435,29 @@ class Premiumize:
             "name": new_name
         }
 
-        req_res = self._request("/folder/rename", params=params)
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error renaming folder: " +
-                                      req_res["message"])
+        self._call("folder_rename", params, "Error renaming folder")
 
     def move_item(self, item, folder_id=None):
         """
         Moves C{item} to the folder with the id C{folder_id}. If C{folder_id}
-        is not given, C{item} will be moved into the root folder.
+        is not given, C{item} will be moved into the root folder. Items that
+        already are the target folder are skipped; if nothing is left to
+        move, no request is sent.
 
         @param item: Item that should be moved
-        @type item: L{PremiumizeFile} or C{list} of L{PremiumizeFile}
+        @type item: L{PremiumizeFile} or iterable of L{PremiumizeFile}, e.g.
+            the generator returned by L{iter_folder}
         @param folder_id: ID of the folder that C{item} should be moved to
         @type folder_id: C{str}
 
         @raise PremiumizeException: if there was an error moving the item(s)
         """
+        params = _move_params(item, folder_id)
 
-        params={}
-
-        if folder_id is not None:
-            params['id'] = folder_id
-
-        if type(item) is list:
-            for index, i_item in zip(range(len(item)), item):
-                if not str(i_item.id) == str(folder_id):
-                    params["items[%i][id]" % index] = i_item.id
-                    params["items[%i][type]" % index] = i_item.type
-
-            if len(params) < 2:
-                # Operation is trivial
-                return
+        if params is None:
+            return
 
-        else:
-            params["items[0][id]"] = item.id
-            params["items[0][type]"] = item.type
-
-        req_res = self._request("/folder/paste", params=params)
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error moving item: " +
-                                      req_res["message"])
+        self._call("folder_paste", params, "Error moving item")
 
     def delete_item(self, item):
         """
@@ -202,12 +473,49 @@ class Premiumize:
             "id": item.id
         }
 
-        req_res = self._request("/item/delete", params=params)
+        self._call("item_delete", params, "Error deleting item")
+
+    def delete_items(self, items):
+        """
+        Delete all of C{items} from the cloud storage. The requests are issued
+        concurrently, so this operation is B{not} atomic: if one deletion
+        fails, others may already have succeeded.
+
+        @param items: items to delete
+        @type items: iterable of L{PremiumizeFile}
+
+        @raise PremiumizeException: if there was an error deleting an item.
+        """
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            list(executor.map(self.delete_item, items))
+
+    def iter_browse_torrent(self, item):
+        """
+        Iterate over the contents of a torrent in cloud storage. The request
+        is sent when iteration starts; files are created one at a time.
+
+        @param item: Torrent to view
+        @type item: L{PremiumizeFile}
+
+        @return: Contents of the Torrent
+        @rtype: generator of L{PremiumizeFile}
+
+        @raise PremiumizeException: If there was an error browsing the torrent
+
+        """
+        params = _browse_params(item)
+
+        req_res = self._request("torrent_browse", params=params)
 
         if req_res["status"] == "error":
-            raise PremiumizeException("Error moving item: " +
+            raise PremiumizeException("Error browsing torrent: " +
                                       req_res["message"])
 
+        content = req_res['content']
+        del req_res
+
+        yield from _torrent_files(content)
+
     def browse_torrent(self, item):
         """
         View the contents of a torrent in cloud storage
@@ -221,29 +529,23 @@ class Premiumize:
         @raise PremiumizeException: If there was an error browsing the torrent
 
         """
-        if item.type != "torrent":
-            raise PremiumizeException("item is not a torrent")
+        return list(self.iter_browse_torrent(item))
 
-        params = {
-            "hash": item.hash
-        }
-
-        req_res = self._request("/torrent/browse", params=params)
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error browsing torrent: " +
-                                      req_res["message"])
+    def browse_torrents(self, items):
+        """
+        View the contents of several torrents in cloud storage. The torrents
+        are browsed concurrently.
 
-        res = []
+        @param items: Torrents to view
+        @type items: iterable of L{PremiumizeFile}
 
-        for key in req_res['content']:
-            for item_name in req_res['content'][key]['children']:
-                res.append(
-                    PremiumizeFile(req_res['content'][key]['children'][item_name])
-                )
+        @return: Contents of each torrent, in the order of C{items}
+        @rtype: C{list} of C{list} of L{PremiumizeFile}
 
-        # TODO: Convert to PremiumizeFile recursively
-        return res
+        @raise PremiumizeException: If there was an error browsing a torrent
+        """
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            return list(executor.map(self.browse_torrent, items))
 
     def start_transfer(self, source, folder_id=None):
         """
@@ -269,11 +571,7 @@ class Premiumize:
         if folder_id is not None:
             params['folder_id'] = folder_id
 
-        req_res = self._request("/transfer/create", params=params)
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error starting transfer: " +
-                                      req_res["message"])
+        self._call("transfer_create", params, "Error starting transfer")
 
     def list_transfer(self):
         """
@@ -283,9 +581,10 @@ class Premiumize:
         @return: list of structures with transfer information
         @rtype: C{list} of C{dict}
         """
-        req_res = self._request("/transfer/list")
+        req_res = self._cached_request("transfer_list")
 
-        return req_res['transfers']
+        # Copy, the response may be shared through the read cache
+        return [dict(transfer) for transfer in req_res['transfers']]
 
     def clear_finished_transfer(self):
         """
@@ -294,11 +593,8 @@ class Premiumize:
         @raise PremiumizeException: If there was an error clearing the finished
             transfers.
         """
-        req_res = self._request("/transfer/clearfinished")
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error starting transfer: " +
-                                      req_res["message"])
+        self._call("transfer_clearfinished", None,
+                   "Error clearing finished transfers")
 
 
     def abort_transfer(self, type, id):
@@ -319,8 +615,4 @@ class Premiumize:
             "id": id
         }
 
-        req_res = self._request("/transfer/delete", params=params)
-
-        if req_res["status"] == "error":
-            raise PremiumizeException("Error deleting transfer: " +
-                                      req_res["message"])
+        self._call("transfer_delete", params, "Error deleting transfer")
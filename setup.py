@@ -9,10 +9,18 @@ setup(name="premiumize",
       author_email="johannes@weltraumpflege.org",
       url="https://github.com/waaaaargh/premiumizepy",
 
+      python_requires='>=3.10',
+
       install_requires=[
-          'requests'
+          'httpx[http2]>=0.27.1',
       ],
 
+      extras_require={
+          'fast': ['orjson>=3.10'],
+          'cache': ['cachetools'],
+          'compression': ['httpx[brotli,zstd]'],
+      },
+
       packages=[
           'premiumize',
       ]
@@ -0,0 +1,48 @@
+import threading
+import unittest
+
+import httpx
+
+from premiumize.premiumize import Premiumize
+from premiumize.filetypes import PremiumizeFile
+
+
+class ReadCacheTest(unittest.TestCase):
+    def test_invalidation_during_read_is_not_undone(self):
+        files = [{"id": "1", "name": "a", "type": "file"}]
+        listing_started = threading.Event()
+        release_listing = threading.Event()
+        hold_listing = True
+
+        def handler(request):
+            nonlocal hold_listing
+            if request.url.path.endswith("/folder/list"):
+                # Snapshot the state before blocking, like a server answering
+                # with data that is outdated by the time it arrives
+                content = list(files)
+                if hold_listing:
+                    hold_listing = False
+                    listing_started.set()
+                    release_listing.wait(5)
+                return httpx.Response(200, json={"status": "success",
+                                                 "content": content})
+            files.clear()
+            return httpx.Response(200, json={"status": "success"})
+
+        client = Premiumize("user", "pin", cache_ttl=60)
+        client._client = httpx.Client(
+            transport=httpx.MockTransport(handler))
+
+        reader = threading.Thread(target=client.list_folder)
+        reader.start()
+        self.assertTrue(listing_started.wait(5))
+
+        client.delete_item(PremiumizeFile(id="1", type="file"))
+        release_listing.set()
+        reader.join(5)
+
+        self.assertEqual(client.list_folder(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()